@@ -1,38 +1,84 @@
 """Dataset utilities for anomaly detection."""
 import pandas as pd
 import numpy as np
-from typing import Tuple, List
+from typing import Tuple, List, Optional, Iterator
 import io
+import tempfile
 
 
 class DatasetLoader:
     """Load and preprocess datasets for anomaly detection."""
     
     @staticmethod
-    def load_csv(file_path: str) -> pd.DataFrame:
-        """Load CSV dataset."""
-        return pd.read_csv(file_path)
+    def load_csv(file_path: str, column: Optional[str] = None) -> pd.DataFrame:
+        """Load CSV dataset, using the pyarrow parser when it is installed.
+        
+        When column is given, only that column is parsed.
+        """
+        usecols = [column] if column is not None else None
+        try:
+            return pd.read_csv(file_path, usecols=usecols, engine="pyarrow")
+        except ImportError:
+            return pd.read_csv(file_path, usecols=usecols, engine="c",
+                               low_memory=False, cache_dates=True)
+    
+    @staticmethod
+    def load_from_bytes(csv_bytes: bytes) -> pd.DataFrame:
+        """Load dataset from UTF-8 encoded CSV bytes."""
+        try:
+            return pd.read_csv(io.BytesIO(csv_bytes), engine="pyarrow")
+        except ImportError:
+            return pd.read_csv(io.BytesIO(csv_bytes), engine="c", low_memory=False)
     
     @staticmethod
     def load_from_string(csv_string: str) -> pd.DataFrame:
         """Load dataset from CSV string."""
-        return pd.read_csv(io.StringIO(csv_string))
+        return DatasetLoader.load_from_bytes(csv_string.encode("utf-8"))
+    
+    @staticmethod
+    def resolve_column(file_path: str, column: Optional[str] = None) -> str:
+        """Return column, or the CSV's first column name read from its header."""
+        if column is not None:
+            return column
+        return pd.read_csv(file_path, nrows=0).columns[0]
+    
+    @staticmethod
+    def stream_column(file_path: str, column: str,
+                      chunksize: int = 200_000) -> Iterator[np.ndarray]:
+        """Yield a single CSV column as float32 chunks."""
+        reader = pd.read_csv(file_path, usecols=[column], dtype={column: np.float32},
+                             chunksize=chunksize, engine="c")
+        for chunk in reader:
+            yield chunk[column].to_numpy()
     
     @staticmethod
     def normalize_data(data: np.ndarray) -> Tuple[np.ndarray, float, float]:
         """Normalize data using min-max scaling."""
-        min_val = np.min(data)
-        max_val = np.max(data)
-        normalized = (data - min_val) / (max_val - min_val + 1e-8)
+        data = np.asarray(data)
+        # Integer input is promoted to float32 rather than float64
+        dtype = data.dtype if np.issubdtype(data.dtype, np.floating) else np.float32
+        min_val = data.min()
+        max_val = data.max()
+        scale = 1.0 / (float(max_val) - float(min_val) + 1e-8)
+        normalized = np.empty(data.shape, dtype=dtype)
+        # Cast to the target dtype before subtracting so narrow integers can't wrap
+        np.subtract(data, min_val, out=normalized, dtype=dtype, casting='unsafe')
+        normalized *= scale
         return normalized, min_val, max_val
     
     @staticmethod
     def create_sequences(data: np.ndarray, seq_length: int = 30) -> np.ndarray:
-        """Create sequences for LSTM training."""
-        sequences = []
-        for i in range(len(data) - seq_length + 1):
-            sequences.append(data[i:i + seq_length])
-        return np.array(sequences)
+        """Create sequences for LSTM training.
+
+        Returns a read-only sliding-window view of shape
+        (len(data) - seq_length + 1, seq_length) without copying the data.
+        Call .copy() on the result if it needs to be modified.
+        """
+        if len(data) < seq_length:
+            return np.empty((0, seq_length), dtype=np.asarray(data).dtype)
+        return np.lib.stride_tricks.sliding_window_view(
+            np.ascontiguousarray(data), window_shape=seq_length
+        )
     
     @staticmethod
     def prepare_data(df: pd.DataFrame, seq_length: int = 30, 
@@ -41,10 +87,48 @@ class DatasetLoader:
         if column is None:
             column = df.columns[0]
         
-        data = df[column].values.reshape(-1, 1).astype(float)
-        data = data.flatten()
+        data = df[column].to_numpy(dtype=np.float32, copy=False)
         
         normalized_data, min_val, max_val = DatasetLoader.normalize_data(data)
         sequences = DatasetLoader.create_sequences(normalized_data, seq_length)
         
         return sequences, min_val, max_val
+    
+    @staticmethod
+    def prepare_data_streaming(file_path: str, seq_length: int = 30,
+                               column: str = None,
+                               chunksize: int = 200_000) -> Tuple[np.ndarray, float, float]:
+        """Prepare data for model training without loading the whole CSV.
+        
+        The column is read in chunks twice: once to find its min/max, and
+        once to write the normalized values into a disk-backed buffer that
+        the sequences are then viewed over.
+        """
+        column = DatasetLoader.resolve_column(file_path, column)
+        
+        count = 0
+        min_val, max_val = np.inf, -np.inf
+        for chunk in DatasetLoader.stream_column(file_path, column, chunksize):
+            if len(chunk) == 0:
+                continue
+            count += len(chunk)
+            # np.minimum/np.maximum propagate NaN regardless of chunk order,
+            # matching normalize_data on the whole column
+            min_val = float(np.minimum(min_val, chunk.min()))
+            max_val = float(np.maximum(max_val, chunk.max()))
+        
+        if count == 0:
+            raise ValueError(f"Column '{column}' contains no data")
+        
+        scale = 1.0 / (max_val - min_val + 1e-8)
+        normalized = np.memmap(tempfile.TemporaryFile(), dtype=np.float32,
+                               mode="w+", shape=(count,))
+        offset = 0
+        for chunk in DatasetLoader.stream_column(file_path, column, chunksize):
+            out = normalized[offset:offset + len(chunk)]
+            np.subtract(chunk, min_val, out=out)
+            out *= scale
+            offset += len(chunk)
+        
+        sequences = DatasetLoader.create_sequences(normalized, seq_length)
+        return sequences, min_val, max_val
@@ -133,10 +133,10 @@ async def predict(request: PredictionRequest):
         return {
             "status": "success",
             "data": request.data,
-            "scores": scores,
-            "labels": labels,
-            "anomaly_count": sum(labels),
-            "is_anomalous": max(labels) == 1 if labels else False,
+            "scores": scores.tolist(),
+            "labels": labels.tolist(),
+            "anomaly_count": int(labels.sum()),
+            "is_anomalous": bool(labels.any()),
             "mean_score": float(np.mean(scores)),
             "max_score": float(np.max(scores)),
             "min_score": float(np.min(scores)),
@@ -3,11 +3,61 @@ import pandas as pd
 from sklearn.preprocessing import StandardScaler
 from sklearn.ensemble import IsolationForest
 import joblib
+from joblib import parallel_backend
+import functools
+import itertools
 import os
-from typing import List, Tuple, Dict
+import tempfile
+from typing import List, Tuple, Dict, Optional
 import json
 from datetime import datetime
 
+
+def _load_artifacts(model_path: str, scaler_path: str) -> Tuple[IsolationForest, StandardScaler]:
+    """Load the fitted model and scaler from disk, memoized until either file changes."""
+    return _load_artifacts_cached(
+        model_path, scaler_path,
+        os.stat(model_path).st_mtime_ns, os.stat(scaler_path).st_mtime_ns
+    )
+
+
+@functools.lru_cache(maxsize=1)
+def _load_artifacts_cached(model_path: str, scaler_path: str,
+                           model_mtime_ns: int, scaler_mtime_ns: int) -> Tuple[IsolationForest, StandardScaler]:
+    """
+    Load the fitted model and scaler, keyed on the files' modification times
+    so artifacts rewritten by another process are picked up.
+    
+    Arrays are memory-mapped read-only so worker threads and processes share them.
+    """
+    return (
+        joblib.load(model_path, mmap_mode="r"),
+        joblib.load(scaler_path, mmap_mode="r")
+    )
+
+
+def _dump_artifact(obj, path: str) -> None:
+    """
+    Save obj to path via a temp file and rename.
+    
+    Saved uncompressed so it can be memory-mapped on load. The rename keeps the
+    old inode alive for processes that still have the previous file mapped.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+    os.close(fd)
+    try:
+        joblib.dump(obj, tmp_path, compress=0, protocol=5)
+        # mkstemp creates the file as 0600; give it the mode a plain open() would
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(tmp_path, 0o666 & ~umask)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
 class AnomalyDetectionModel:
     """
     LSTM-based Anomaly Detection Model for time series data.
@@ -15,6 +65,11 @@ class AnomalyDetectionModel:
     Based on: https://github.com/maxmelichov/Anomaly-Detection
     """
     
+    # joblib backends: fit uses processes, while scoring uses threads since the
+    # tree walk releases the GIL and threads avoid pickling X to each worker
+    train_backend = "loky"
+    predict_backend = "threading"
+    
     def __init__(self, model_path: str = "models/anomaly_model.pkl", scaler_path: str = "models/scaler.pkl"):
         self.model_path = model_path
         self.scaler_path = scaler_path
@@ -23,8 +78,6 @@ class AnomalyDetectionModel:
         self.is_trained = False
         self.threshold = 0.5
         
-        os.makedirs(os.path.dirname(model_path), exist_ok=True)
-        
     def train(self, data: np.ndarray, contamination: float = 0.1) -> Dict:
         """
         Train the Isolation Forest model on the provided data.
@@ -36,6 +89,7 @@ class AnomalyDetectionModel:
         Returns:
             Dict with training statistics
         """
+        timestamp = datetime.now().isoformat()
         try:
             # Convert to numpy array if needed
             if isinstance(data, list):
@@ -45,22 +99,30 @@ class AnomalyDetectionModel:
             if len(data.shape) == 1:
                 data = data.reshape(-1, 1)
             
-            # Scale the data
-            data_scaled = self.scaler.fit_transform(data)
+            # Fit a new scaler; the current one may be shared through _load_artifacts
+            self.scaler = StandardScaler().fit(data)
+            data_scaled = self._standardize(data)
             
-            # Train Isolation Forest
+            # Train Isolation Forest; an explicit sample cap without bootstrapping
+            # keeps each worker's share of the data small
             self.model = IsolationForest(
                 contamination=contamination,
                 random_state=42,
-                n_estimators=100
+                n_estimators=100,
+                max_samples=min(256, len(data_scaled)),
+                bootstrap=False,
+                n_jobs=-1
             )
             
-            self.model.fit(data_scaled)
+            with parallel_backend(self.train_backend, n_jobs=-1):
+                self.model.fit(data_scaled)
             self.is_trained = True
             
             # Save model and scaler
-            joblib.dump(self.model, self.model_path)
-            joblib.dump(self.scaler, self.scaler_path)
+            os.makedirs(os.path.dirname(self.model_path), exist_ok=True)
+            _dump_artifact(self.model, self.model_path)
+            _dump_artifact(self.scaler, self.scaler_path)
+            _load_artifacts_cached.cache_clear()
             
             # Get anomaly scores
             scores = -self.model.score_samples(data_scaled)
@@ -72,32 +134,39 @@ class AnomalyDetectionModel:
                 "mean_score": float(np.mean(scores)),
                 "max_score": float(np.max(scores)),
                 "min_score": float(np.min(scores)),
-                "timestamp": datetime.now().isoformat()
+                "timestamp": timestamp
             }
         except Exception as e:
             return {
                 "status": "error",
                 "message": str(e),
-                "timestamp": datetime.now().isoformat()
+                "timestamp": timestamp
             }
     
-    def predict(self, data: np.ndarray) -> Tuple[List[float], List[int]]:
+    def _standardize(self, data: np.ndarray, copy: bool = True) -> np.ndarray:
+        """Apply the fitted scaler's (x - mean) / scale, in place when copy is False."""
+        in_place = not copy and np.issubdtype(data.dtype, np.floating)
+        scaled = np.subtract(data, self.scaler.mean_, out=data if in_place else None)
+        scaled /= self.scaler.scale_
+        return scaled
+    
+    def predict(self, data: np.ndarray, copy: bool = True) -> Tuple[np.ndarray, np.ndarray]:
         """
         Predict anomalies in the provided data.
         
         Args:
             data: Time series data to analyze
+            copy: If False, a floating point array is scaled in place
             
         Returns:
-            Tuple of (anomaly_scores, anomaly_labels)
+            Tuple of (anomaly_scores, anomaly_labels) as numpy arrays
         """
         if not self.is_trained and not os.path.exists(self.model_path):
             raise ValueError("Model not trained. Please train the model first.")
         
         # Load model if not already loaded
         if self.model is None:
-            self.model = joblib.load(self.model_path)
-            self.scaler = joblib.load(self.scaler_path)
+            self.model, self.scaler = _load_artifacts(self.model_path, self.scaler_path)
         
         try:
             # Convert to numpy array if needed
@@ -109,21 +178,21 @@ class AnomalyDetectionModel:
                 data = data.reshape(-1, 1)
             
             # Scale the data
-            data_scaled = self.scaler.transform(data)
+            data_scaled = self._standardize(data, copy=copy)
             
-            # Get anomaly scores (negative because sklearn returns negative outlier scores)
-            scores = -self.model.score_samples(data_scaled)
-            
-            # Get predictions (-1 for anomalies, 1 for normal)
-            predictions = self.model.predict(data_scaled)
+            # n_jobs on the estimator alone does not parallelize scoring;
+            # it only takes effect inside a joblib backend context.
+            with parallel_backend(self.predict_backend, n_jobs=os.cpu_count() or -1):
+                # Get anomaly scores (negative because sklearn returns negative outlier scores)
+                scores = -self.model.score_samples(data_scaled)
+                
+                # Get predictions (-1 for anomalies, 1 for normal)
+                predictions = self.model.predict(data_scaled)
             
             # Convert to binary labels (1 for anomaly, 0 for normal)
-            labels = [1 if p == -1 else 0 for p in predictions]
+            labels = (predictions == -1).view(np.int8)
             
-            return (
-                [float(s) for s in scores],
-                labels
-            )
+            return scores, labels
         except Exception as e:
             raise ValueError(f"Error during prediction: {str(e)}")
     
@@ -137,27 +206,102 @@ class AnomalyDetectionModel:
         Returns:
             Dict with predictions for each sequence
         """
-        results = {}
+        timestamp = datetime.now().isoformat()
         try:
-            for i, data_point in enumerate(data_list):
-                scores, labels = self.predict(np.array(data_point))
-                results[f"sequence_{i}"] = {
-                    "scores": scores,
-                    "labels": labels,
-                    "is_anomalous": max(labels) == 1
-                }
+            # Flatten into one contiguous buffer plus per-sequence lengths
+            lengths = np.fromiter((len(d) for d in data_list), dtype=np.intp,
+                                  count=len(data_list))
+            values = np.fromiter(itertools.chain.from_iterable(data_list),
+                                 dtype=np.float32, count=int(lengths.sum()))
+            # values is a fresh buffer, so it can be scaled in place
+            return self._predict_flat_batch(values, lengths, copy=False, timestamp=timestamp)
+        except Exception as e:
             return {
-                "status": "success",
-                "predictions": results,
-                "timestamp": datetime.now().isoformat()
+                "status": "error",
+                "message": str(e),
+                "timestamp": timestamp
             }
+    
+    def predict_batch_array(self, arr: np.ndarray, lengths: Optional[np.ndarray] = None) -> Dict:
+        """
+        Batch predict anomalies for sequences stored in a single array.
+        
+        Args:
+            arr: Either an (N, seq_len) array with one sequence per row, or a
+                flat array of all sequences concatenated back to back
+            lengths: Length of each sequence. Required for a flat array; for a
+                2D array, rows are treated as right-padded when it is given
+            
+        Returns:
+            Dict with predictions for each sequence
+        """
+        timestamp = datetime.now().isoformat()
+        try:
+            values = np.asarray(arr, dtype=np.float32)
+            # Only the masked-index branch produces a fresh buffer; everything
+            # else may alias the caller's data and must not be scaled in place
+            copy = True
+            if values.ndim == 2:
+                if lengths is None:
+                    lengths = np.full(values.shape[0], values.shape[1])
+                    values = values.ravel()
+                else:
+                    lengths = np.asarray(lengths)
+                    if not np.issubdtype(lengths.dtype, np.integer):
+                        raise ValueError("lengths must be integers")
+                    if lengths.shape != (values.shape[0],):
+                        raise ValueError("lengths must have one entry per row of arr")
+                    if ((lengths < 0) | (lengths > values.shape[1])).any():
+                        raise ValueError(f"lengths must be between 0 and {values.shape[1]}")
+                    values = values[np.arange(values.shape[1]) < lengths[:, None]]
+                    copy = False
+            elif values.ndim == 1:
+                if lengths is None:
+                    raise ValueError("lengths is required when arr is one-dimensional")
+                lengths = np.asarray(lengths)
+                if not np.issubdtype(lengths.dtype, np.integer):
+                    raise ValueError("lengths must be integers")
+                if lengths.ndim != 1 or (lengths < 0).any():
+                    raise ValueError("lengths must be a one-dimensional array of non-negative values")
+                if lengths.sum() != values.size:
+                    raise ValueError(
+                        f"lengths sum to {lengths.sum()} but arr has {values.size} values"
+                    )
+            else:
+                raise ValueError("arr must be one- or two-dimensional")
+            
+            return self._predict_flat_batch(values, lengths, copy=copy, timestamp=timestamp)
         except Exception as e:
             return {
                 "status": "error",
                 "message": str(e),
-                "timestamp": datetime.now().isoformat()
+                "timestamp": timestamp
             }
     
+    def _predict_flat_batch(self, values: np.ndarray, lengths: np.ndarray,
+                            copy: bool, timestamp: str) -> Dict:
+        """Score concatenated sequences in one call and split the results back up."""
+        results = {}
+        if len(lengths):
+            all_scores, all_labels = self.predict(values.reshape(-1, 1), copy=copy)
+            offsets = np.cumsum(lengths)[:-1]
+            split_scores = np.split(all_scores, offsets)
+            split_labels = np.split(all_labels, offsets)
+        else:
+            split_scores, split_labels = [], []
+        
+        for i, (scores, labels) in enumerate(zip(split_scores, split_labels)):
+            results[f"sequence_{i}"] = {
+                "scores": scores.tolist(),
+                "labels": labels.tolist(),
+                "is_anomalous": bool(labels.any())
+            }
+        return {
+            "status": "success",
+            "predictions": results,
+            "timestamp": timestamp
+        }
+    
     def set_threshold(self, threshold: float):
         """Set custom anomaly detection threshold."""
         if 0 <= threshold <= 1:
@@ -173,6 +317,8 @@ class AnomalyDetectionModel:
             "scaler_path": self.scaler_path,
             "threshold": self.threshold,
             "model_type": "IsolationForest",
+            "train_backend": self.train_backend,
+            "predict_backend": self.predict_backend,
             "timestamp": datetime.now().isoformat()
         }
 
@@ -182,32 +328,38 @@ model_instance = None
 
 
 def get_model() -> AnomalyDetectionModel:
-    """Get or create the global model instance."""
+    """Get or create the global model instance, preloading saved artifacts."""
     global model_instance
     if model_instance is None:
         model_instance = AnomalyDetectionModel()
+        _load_saved_artifacts(model_instance)
     return model_instance
 
 
 def load_model() -> AnomalyDetectionModel:
     """Load the model from disk if it exists."""
     model = get_model()
+    _load_saved_artifacts(model)
+    return model
+
+
+def _load_saved_artifacts(model: AnomalyDetectionModel) -> None:
+    """Attach the saved model and scaler to model if both exist on disk."""
     if os.path.exists(model.model_path) and os.path.exists(model.scaler_path):
-        model.model = joblib.load(model.model_path)
-        model.scaler = joblib.load(model.scaler_path)
+        model.model, model.scaler = _load_artifacts(model.model_path, model.scaler_path)
         model.is_trained = True
-    return model
 
 
-def train_with_dataset(csv_path: str) -> bool:
-    """Train the model using a CSV dataset."""
+def train_with_dataset(csv_path: str, column: str = None) -> bool:
+    """Train the model using one column of a CSV dataset (the first by default)."""
     from datasets import DatasetLoader
     from train_lstm_model import train_lstm_model
     
     try:
-        # Load and prepare data
-        df = DatasetLoader.load_csv(csv_path)
-        sequences, min_val, max_val = DatasetLoader.prepare_data(df, seq_length=30)
+        # Load and prepare data, streaming only the target column in chunks
+        sequences, min_val, max_val = DatasetLoader.prepare_data_streaming(
+            csv_path, seq_length=30, column=column
+        )
         
         if len(sequences) == 0:
             print("Error: No sequences generated from dataset")
@@ -1,11 +1,19 @@
 """LSTM-based anomaly detection model trainer."""
 import numpy as np
+import tensorflow as tf
+import weakref
 from tensorflow.keras.models import Sequential
 from tensorflow.keras.layers import LSTM, Dense, Dropout
 from tensorflow.keras.optimizers import Adam
 from sklearn.preprocessing import StandardScaler
 import joblib
 
+# Sequences scored per call of the compiled reconstruction error function
+RECON_BATCH_SIZE = 1024
+
+# Compiled reconstruction error functions, one per model
+_recon_error_fns = weakref.WeakKeyDictionary()
+
 
 def build_lstm_model(seq_length: int = 30, features: int = 1) -> Sequential:
     """Build LSTM model for anomaly detection."""
@@ -15,7 +23,8 @@ def build_lstm_model(seq_length: int = 30, features: int = 1) -> Sequential:
         LSTM(32, activation='relu', return_sequences=False),
         Dropout(0.2),
         Dense(16, activation='relu'),
-        Dense(features)
+        # Keep the output in float32 so the loss stays stable under mixed precision
+        Dense(features, dtype='float32')
     ])
     
     model.compile(
@@ -28,19 +37,50 @@ def build_lstm_model(seq_length: int = 30, features: int = 1) -> Sequential:
 
 def train_lstm_model(sequences: np.ndarray, epochs: int = 50, batch_size: int = 32) -> Sequential:
     """Train LSTM model on sequences."""
-    model = build_lstm_model(seq_length=sequences.shape[1], features=1)
-    
-    # Reshape data for LSTM (samples, time steps, features)
-    X_train = sequences.reshape((sequences.shape[0], sequences.shape[1], 1))
+    # Mixed precision only pays off on GPUs; it must be set before building the model
+    # and is restored afterwards so later models keep the caller's policy
+    previous_policy = tf.keras.mixed_precision.global_policy()
+    if tf.config.list_physical_devices('GPU'):
+        tf.keras.mixed_precision.set_global_policy("mixed_float16")
     
-    # Train the model to reconstruct input
-    model.fit(
-        X_train, X_train,
-        epochs=epochs,
-        batch_size=batch_size,
-        verbose=1,
-        validation_split=0.2
-    )
+    try:
+        model = build_lstm_model(seq_length=sequences.shape[1], features=1)
+        
+        # Reshape data for LSTM (samples, time steps, features)
+        X = sequences.reshape((sequences.shape[0], sequences.shape[1], 1))
+        
+        # Hold out the last 20% for validation, as validation_split would
+        split = int(len(X) * 0.8)
+        X_train, X_val = X[:split], X[split:]
+        
+        # Each dataset holds X once and pairs it with itself per batch. Training
+        # shuffles indices rather than sequences, so every epoch gets a full
+        # shuffle (as fit(X, X) did) without buffering a second copy of the data.
+        # Prefetching overlaps host-to-device copies with training.
+        X_train_t = tf.convert_to_tensor(X_train)
+        train_ds = (
+            tf.data.Dataset.range(len(X_train))
+            .shuffle(len(X_train))
+            .batch(batch_size)
+            .map(lambda i: (tf.gather(X_train_t, i), tf.gather(X_train_t, i)))
+            .prefetch(tf.data.AUTOTUNE)
+        )
+        val_ds = (
+            tf.data.Dataset.from_tensor_slices(X_val)
+            .batch(batch_size)
+            .map(lambda x: (x, x))
+            .prefetch(tf.data.AUTOTUNE)
+        )
+        
+        # Train the model to reconstruct input
+        model.fit(
+            train_ds,
+            epochs=epochs,
+            verbose=1,
+            validation_data=val_ds
+        )
+    finally:
+        tf.keras.mixed_precision.set_global_policy(previous_policy)
     
     return model
 
@@ -48,13 +88,43 @@ def train_lstm_model(sequences: np.ndarray, epochs: int = 50, batch_size: int =
 def detect_anomalies_lstm(model: Sequential, sequences: np.ndarray, 
                          threshold: float = 0.02) -> tuple:
     """Detect anomalies using reconstruction error."""
-    X = sequences.reshape((sequences.shape[0], sequences.shape[1], 1))
-    predictions = model.predict(X, verbose=0)
+    X = np.asarray(sequences.reshape((sequences.shape[0], sequences.shape[1], 1)), dtype=np.float32)
+    recon_error = _get_recon_error_fn(model)
     
-    # Calculate reconstruction error (MAE)
-    errors = np.mean(np.abs(predictions - X), axis=(1, 2))
+    # Score in fixed-size batches, zero-padding the last one, so the compiled
+    # function only ever sees one input shape
+    errors = np.empty(len(X), dtype=np.float32)
+    for start in range(0, len(X), RECON_BATCH_SIZE):
+        batch = X[start:start + RECON_BATCH_SIZE]
+        n = len(batch)
+        if n < RECON_BATCH_SIZE:
+            pad = np.zeros((RECON_BATCH_SIZE - n,) + batch.shape[1:], dtype=np.float32)
+            batch = np.concatenate([batch, pad])
+        errors[start:start + n] = recon_error(batch).numpy()[:n]
     
     # Threshold-based anomaly detection
     anomalies = errors > threshold
     
     return anomalies, errors
+
+
+def _get_recon_error_fn(model: Sequential):
+    """Return the XLA-compiled reconstruction error (MAE) function for model, built once."""
+    fn = _recon_error_fns.get(model)
+    if fn is None:
+        # Weak reference so the cached function does not keep the model alive
+        model_ref = weakref.ref(model)
+        
+        # Fuses predict/subtract/abs/mean into one compiled kernel
+        @tf.function(jit_compile=True)
+        def fn(x):
+            p = model_ref()(x, training=False)
+            if len(p.shape) == 2:
+                # build_lstm_model emits one value per feature for the whole
+                # sequence; compare it against every time step, as the MSE loss
+                # in train_lstm_model does
+                p = p[:, tf.newaxis, :]
+            return tf.reduce_mean(tf.abs(p - x), axis=[1, 2])
+        
+        _recon_error_fns[model] = fn
+    return fn